@@ -10,14 +10,284 @@ bl_info = {
 
 import bpy
 import os
-from mathutils import Vector
-from bpy.props import StringProperty, FloatProperty, IntProperty, PointerProperty, EnumProperty
+import sys
+import json
+import subprocess
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from bpy.props import StringProperty, FloatProperty, IntProperty, BoolProperty, PointerProperty, EnumProperty
 from bpy.types import Operator, Panel
+from bpy.app.handlers import persistent
 from bpy_extras.io_utils import ExportHelper
 
 # Define a minimum dimension for imported projects to prevent zero-sized spacing
 MIN_PROJECT_DIMENSION = 0.1 # Adjust this value based on typical object scale in your files
 
+# Sidecar file in the import folder that remembers project extents between runs
+EXTENTS_CACHE_NAME = '.batch_import_extents.json'
+
+# Background scanning: below this many files the start-up cost of extra Blender processes
+# outweighs the parallel speed-up, so the scan stays in-process.
+PARALLEL_SCAN_MIN_FILES = 10
+# Command-line flag that turns this file into a scan worker, and the prefix of its result lines
+SCAN_WORKER_ARG = '--batch-import-scan'
+SCAN_RESULT_PREFIX = 'BATCH_IMPORT_EXTENTS'
+# Seconds a scan worker may spend per file before it is killed and its files are scanned in-process
+SCAN_WORKER_TIMEOUT_PER_FILE = 60
+
+# Object types whose bound_box describes actual geometry; every other type (Empties, Cameras,
+# Lights, ...) reports an all-zero box and only contributes its origin to the extents.
+BOUNDED_OBJECT_TYPES = {
+    'MESH', 'CURVE', 'CURVES', 'SURFACE', 'FONT', 'META', 'VOLUME', 'POINTCLOUD',
+    'GPENCIL', 'GREASEPENCIL', 'ARMATURE', 'LATTICE',
+}
+
+def _iter_blend(folder):
+    """Yield the paths of all .blend files below folder (unsorted).
+
+    Uses an explicit os.scandir stack; DirEntry caches the file type from the directory
+    read, so no extra stat calls are needed. Like os.walk, symlinked directories are not
+    followed and unreadable directories are skipped.
+    """
+    stack = [folder]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                elif entry.name[-6:].lower() == '.blend':
+                    yield entry.path
+
+def _reduce_xy_extents(mats, box_min, box_max):
+    """Return the world-space XY (lo, hi) arrays of local boxes under row-major mats (N, 4, 4).
+
+    box_min/box_max (N, 3) are each bound_box's corners 0 and 6. The box center is transformed
+    and widened by the absolute rotation rows times the half extents, which is the exact
+    world-space AABB of all 8 corners without transforming them one by one.
+    """
+    center = (box_min + box_max) * 0.5
+    half = (box_max - box_min) * 0.5
+    rot = mats[:, :2, :3]
+    world_c = np.einsum('nij,nj->ni', rot, center) + mats[:, :2, 3]
+    world_h = np.einsum('nij,nj->ni', np.abs(rot), half)
+    return (world_c - world_h).min(axis=0), (world_c + world_h).max(axis=0)
+
+def _compute_xy_extents(objs):
+    """Return (minx, maxx, miny, maxy, found_bounding_object) for objs in world space.
+
+    Objects of a BOUNDED_OBJECT_TYPES type contribute their transformed bound_box, others only
+    their origin. Returns None when objs is empty.
+    """
+    bbox_objs = []
+    other_objs = []
+    for obj in objs:
+        if obj.type in BOUNDED_OBJECT_TYPES:
+            bbox_objs.append(obj)
+        else:
+            other_objs.append(obj)
+    if not bbox_objs and not other_objs:
+        return None
+
+    lo = np.full(2, np.inf)
+    hi = np.full(2, -np.inf)
+    if bbox_objs: # Objects with a valid bounding box (e.g., meshes, volumes, curves)
+        # One Python pass to copy matrices and boxes out of RNA, the math runs vectorized.
+        # Only the min/max corners are needed, so the other 6 are never read from RNA.
+        mats = np.array([obj.matrix_world for obj in bbox_objs], dtype=np.float64)
+        corners = np.array([(bbox[0], bbox[6]) for bbox in (obj.bound_box for obj in bbox_objs)],
+                           dtype=np.float64)
+        lo, hi = _reduce_xy_extents(mats, corners[:, 0], corners[:, 1])
+    if other_objs: # Objects without a bound_box (e.g., Empties, Cameras, Lights) only contribute their origin
+        origins = np.array([obj.matrix_world.translation.xy for obj in other_objs], dtype=np.float64)
+        lo = np.minimum(lo, origins.min(axis=0))
+        hi = np.maximum(hi, origins.max(axis=0))
+    return float(lo[0]), float(hi[0]), float(lo[1]), float(hi[1]), bool(bbox_objs)
+
+def _compute_xy_extents_bulk(objects):
+    """Vectorized _compute_xy_extents for a bpy_prop_collection of objects (e.g. scene.objects).
+
+    All world matrices and bound boxes are read with two foreach_get calls instead of a Python
+    pass. Objects without geometry report an all-zero bound_box, so they reduce to their origin
+    just like in _compute_xy_extents. Returns (minx, maxx, miny, maxy), or None when objects
+    is empty.
+    """
+    n = len(objects)
+    if not n:
+        return None
+    mats = np.empty(n * 16, dtype=np.float32)
+    boxes = np.empty(n * 24, dtype=np.float32)
+    objects.foreach_get('matrix_world', mats)
+    objects.foreach_get('bound_box', boxes)
+    mats = mats.reshape(n, 4, 4).transpose(0, 2, 1) # foreach_get yields column-major matrices
+    boxes = boxes.reshape(n, 8, 3)
+    lo, hi = _reduce_xy_extents(mats, boxes[:, 0], boxes[:, 6])
+    return float(lo[0]), float(hi[0]), float(lo[1]), float(hi[1])
+
+def _peek_extents(path):
+    """Return (minx, miny, width, depth) of the objects stored in the .blend at path.
+
+    The file is linked instead of appended, so bounds are read without copying any data into
+    this file; removing the library afterwards drops the linked data again. Files without
+    objects are answered from the library listing alone.
+    """
+    # Files that are already linked into the scene are appended so their library stays intact
+    link = not any(os.path.normpath(bpy.path.abspath(lib.filepath)) == os.path.normpath(path)
+                   for lib in bpy.data.libraries)
+    existing_libs = set(bpy.data.libraries)
+    with bpy.data.libraries.load(path, link=link) as (data_from, data_to):
+        # Request objects only: meshes and other data come along solely as their dependencies,
+        # and nothing else (materials, images, scenes, ...) is mapped. assets_only=True is not
+        # an option here since it would skip every object not marked as an asset.
+        has_objects = bool(data_from.objects)
+        if has_objects:
+            data_to.objects = data_from.objects
+    # After the load data_to holds the loaded objects themselves (None where loading failed)
+    new_objs = [o for o in data_to.objects if o is not None] if has_objects else []
+
+    # compute bounds
+    bounds = _compute_xy_extents(new_objs)
+    if bounds:
+        minx, maxx, miny, maxy, found_bounding_object = bounds
+        width = maxx - minx
+        depth = maxy - miny
+
+        # Ensure a minimum dimension if no objects with valid bounding boxes were found,
+        # or if the calculated dimension is effectively zero (e.g., only point-like objects).
+        # This prevents projects from having zero width/depth, which breaks spacing.
+        if not found_bounding_object or width < 0.001: # Check against a small epsilon
+            width = max(width, MIN_PROJECT_DIMENSION)
+        if not found_bounding_object or depth < 0.001: # Check against a small epsilon
+            depth = max(depth, MIN_PROJECT_DIMENSION)
+    else: # No objects in the project at all
+        minx = miny = 0.0
+        width = MIN_PROJECT_DIMENSION # Assign minimum dimension to truly empty projects
+        depth = MIN_PROJECT_DIMENSION # Assign minimum dimension to truly empty projects
+
+    # cleanup, batched so the dependency graph is invalidated once rather than per ID
+    if link:
+        # Removing a library also frees every data-block linked from it
+        bpy.data.batch_remove(ids=[lib for lib in bpy.data.libraries if lib not in existing_libs])
+    elif new_objs:
+        # Take the appended object data along so meshes etc. are not left behind as orphans
+        ids = set(new_objs)
+        ids.update(obj.data for obj in new_objs if obj.data is not None)
+        bpy.data.batch_remove(ids=ids)
+
+    return minx, miny, width, depth
+
+def _scan_parallel(paths):
+    """Measure paths in background Blender processes and return {path: (minx, miny, width, depth)}.
+
+    Each worker runs this file in a factory-startup Blender (see _scan_worker_main), reads its
+    share of the paths from stdin and prints one result line per file. Files a worker could not
+    measure are missing from the result, so the caller can scan them in-process instead.
+    """
+    workers = min(len(paths), os.cpu_count() or 1)
+    cmd = [bpy.app.binary_path, '--background', '--factory-startup',
+           '--python', os.path.abspath(__file__), '--', SCAN_WORKER_ARG]
+
+    def run_worker(chunk):
+        try:
+            proc = subprocess.run(cmd, input='\n'.join(chunk) + '\n', stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, text=True, encoding='utf-8',
+                                  timeout=SCAN_WORKER_TIMEOUT_PER_FILE * len(chunk))
+        except (OSError, subprocess.TimeoutExpired):
+            # Blender binary not runnable, or the worker hung; these paths are scanned in-process
+            return ''
+        return proc.stdout
+
+    # Threads only wait on the child processes, which do the actual work outside this
+    # interpreter; a ProcessPoolExecutor would have to re-launch Blender itself for its workers.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outputs = list(pool.map(run_worker, [paths[i::workers] for i in range(workers)]))
+
+    results = {}
+    for out in outputs:
+        for line in out.splitlines():
+            parts = line.split('\t')
+            if len(parts) == 6 and parts[0] == SCAN_RESULT_PREFIX:
+                results[parts[1]] = tuple(float(v) for v in parts[2:])
+    return results
+
+def _scan_worker_main():
+    """Entry point of a scan worker started by _scan_parallel."""
+    for line in sys.stdin:
+        path = line.rstrip('\n')
+        if not path:
+            continue
+        try:
+            extents = _peek_extents(path)
+        except Exception: # Leave the file to the main process
+            continue
+        print(SCAN_RESULT_PREFIX, path, *extents, sep='\t', flush=True)
+
+def _load_extents_cache(cache_path):
+    """Return the cached {abspath: entry} mapping stored at cache_path.
+
+    Missing or unreadable caches, and caches written by another add-on version (which may
+    measure differently), yield an empty mapping. Malformed entries are dropped so those
+    projects are measured again.
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != list(bl_info['version']):
+        return {}
+    projects = data.get('projects')
+    if not isinstance(projects, dict):
+        return {}
+    return {key: entry for key, entry in projects.items() if _valid_cache_entry(entry)}
+
+
+def _valid_cache_entry(entry):
+    """Return True if entry is a dict holding an 'extents' list of four numbers."""
+    if not isinstance(entry, dict):
+        return False
+    extents = entry.get('extents')
+    return (isinstance(extents, list) and len(extents) == 4
+            and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in extents))
+
+def _save_extents_cache(cache_path, projects):
+    """Write the {abspath: entry} mapping to cache_path; read-only folders are silently skipped."""
+    data = {'version': list(bl_info['version']), 'projects': projects}
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+    except OSError:
+        pass
+
+def _pack_shelf(extents, cols, pad_x, pad_y):
+    """Return per-project (x, y) offsets that pack extents into shelves of cols projects.
+
+    Projects are placed in order of decreasing depth, so each shelf is only as deep as its
+    first project and narrow projects no longer occupy a full max-width cell. Offsets are
+    returned in the order of extents; cols == 0 places everything on a single shelf.
+    """
+    placements = [None] * len(extents)
+    order = sorted(range(len(extents)), key=lambda i: -extents[i][5])
+    cur_x = cur_y = row_max_d = 0.0
+    col = 0
+    for i in order:
+        width, depth = extents[i][4], extents[i][5]
+        if cols > 0 and col == cols: # Start the next shelf
+            cur_x = 0.0
+            cur_y += row_max_d + pad_y
+            row_max_d = 0.0
+            col = 0
+        placements[i] = (cur_x, cur_y)
+        cur_x += width + pad_x
+        row_max_d = max(row_max_d, depth)
+        col += 1
+    return placements
+
 # --- ImportCollectionTools.py content (updated for spacing fix) ---
 
 class BATCH_OT_import_projects(Operator):
@@ -33,84 +303,54 @@ class BATCH_OT_import_projects(Operator):
             return {'CANCELLED'}
 
         # gather .blend files recursively
-        blend_paths = []
-        for root, _, files in os.walk(folder):
-            for f in files:
-                if f.lower().endswith('.blend'):
-                    blend_paths.append(os.path.join(root, f))
-        blend_paths.sort()
+        blend_paths = sorted(_iter_blend(folder))
         if not blend_paths:
             self.report({'WARNING'}, 'No .blend files found in the selected folder.')
             return {'CANCELLED'}
 
-        # phase 1: scan extents per project
-        extents = []  # list of (path, minx, miny, width, depth)
+        # phase 1: scan extents per project, reusing cached results for unchanged files
+        cache_path = os.path.join(folder, EXTENTS_CACHE_NAME)
+        cache = _load_extents_cache(cache_path)
+        projects = {}
+        misses = []
         for path in blend_paths:
-            existing = set(bpy.data.objects)
-            with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
-                data_to.objects = data_from.objects
-            new_objs = [o for o in bpy.data.objects if o not in existing]
-
-            # compute bounds
-            if new_objs:
-                minx = miny = float('inf')
-                maxx = maxy = float('-inf')
-                
-                # Flag to check if any mesh/volume/hair objects were found
-                found_bounding_object = False 
-
-                for obj in new_objs:
-                    bbox = getattr(obj, 'bound_box', None)
-                    if bbox: # Objects with a valid bounding box (e.g., meshes, volumes, curves)
-                        found_bounding_object = True
-                        for v in bbox:
-                            wv = obj.matrix_world @ Vector(v)
-                            minx = min(minx, wv.x)
-                            maxx = max(maxx, wv.x)
-                            miny = min(miny, wv.y)
-                            maxy = max(maxy, wv.y)
-                    else: # Objects without a bound_box (e.g., Empties, Cameras, Lights)
-                        wv = obj.matrix_world.translation
-                        # For objects without a bounding box, ensure they still contribute to min/max
-                        # by using their origin, and we'll later apply a minimum dimension if needed.
-                        minx = min(minx, wv.x)
-                        maxx = max(maxx, wv.x)
-                        miny = min(miny, wv.y)
-                        maxy = max(maxy, wv.y)
-                
-                width = maxx - minx
-                depth = maxy - miny
-                
-                # Ensure a minimum dimension if no objects with valid bounding boxes were found,
-                # or if the calculated dimension is effectively zero (e.g., only point-like objects).
-                # This prevents projects from having zero width/depth, which breaks spacing.
-                if not found_bounding_object or width < 0.001: # Check against a small epsilon
-                    width = max(width, MIN_PROJECT_DIMENSION)
-                if not found_bounding_object or depth < 0.001: # Check against a small epsilon
-                    depth = max(depth, MIN_PROJECT_DIMENSION)
-
-            else: # No objects in the project at all
-                minx = miny = 0.0
-                width = MIN_PROJECT_DIMENSION # Assign minimum dimension to truly empty projects
-                depth = MIN_PROJECT_DIMENSION # Assign minimum dimension to truly empty projects
-            
-            extents.append((path, minx, miny, width, depth))
-
-            # cleanup
-            for obj in new_objs:
-                bpy.data.objects.remove(obj, do_unlink=True)
+            key = os.path.abspath(path)
+            st = os.stat(path)
+            entry = cache.get(key)
+            if not entry or entry.get('mtime') != st.st_mtime or entry.get('size') != st.st_size:
+                entry = {'mtime': st.st_mtime, 'size': st.st_size, 'extents': None}
+                misses.append(path)
+            projects[key] = entry
+
+        # Measure cache misses, optionally spread over background Blender processes
+        scanned = {}
+        if wm.batch_import_parallel_scan and len(misses) >= PARALLEL_SCAN_MIN_FILES:
+            scanned = _scan_parallel(misses)
+        for path in misses:
+            result = scanned.get(path)
+            if result is None: # Serial scan, or a worker failed on this file
+                result = _peek_extents(path)
+            projects[os.path.abspath(path)]['extents'] = list(result)
+
+        # list of (path, project_name, minx, miny, width, depth); all per-path string work happens here
+        extents = [(path, os.path.splitext(os.path.basename(path))[0], *projects[os.path.abspath(path)]['extents'])
+                   for path in blend_paths]
+        if projects != cache:
+            _save_extents_cache(cache_path, projects)
 
         # compute max dimensions and padding
         if not extents: # Handle case where no blend files were found at all after processing
             self.report({'WARNING'}, 'No valid project extents found for import.')
             return {'CANCELLED'}
 
-        max_w = max(e[3] for e in extents)
-        max_d = max(e[4] for e in extents)
-        
-        # Ensure max_w and max_d are at least MIN_PROJECT_DIMENSION even if all projects are tiny/empty
-        max_w = max(max_w, MIN_PROJECT_DIMENSION)
-        max_d = max(max_d, MIN_PROJECT_DIMENSION)
+        # Single pass over extents; starting from MIN_PROJECT_DIMENSION ensures max_w and max_d
+        # are at least that even if all projects are tiny/empty
+        max_w = max_d = MIN_PROJECT_DIMENSION
+        for e in extents:
+            if e[4] > max_w:
+                max_w = e[4]
+            if e[5] > max_d:
+                max_d = e[5]
 
         pad_x = wm.batch_import_spacing_x
         pad_y = wm.batch_import_spacing_y
@@ -123,94 +363,110 @@ class BATCH_OT_import_projects(Operator):
             start_y = ref.matrix_world.translation.y
         else:
             # compute existing scene max
-            scene_objs = list(context.scene.objects)
-            if scene_objs:
-                minx_e = miny_e = float('inf')
-                maxx_e = maxy_e = float('-inf')
-                for obj in scene_objs:
-                    bbox = getattr(obj, 'bound_box', None)
-                    if bbox:
-                        for v in bbox:
-                            wv = obj.matrix_world @ Vector(v)
-                            minx_e = min(minx_e, wv.x)
-                            maxx_e = max(maxx_e, wv.x)
-                            miny_e = min(miny_e, wv.y)
-                            maxy_e = max(maxy_e, wv.y)
-                    else: # Fallback for objects without bound_box in existing scene
-                        wv = obj.matrix_world.translation
-                        minx_e = min(minx_e, wv.x)
-                        maxx_e = max(maxx_e, wv.x)
-                        miny_e = min(miny_e, wv.y)
-                        maxy_e = max(maxy_e, wv.y)
-                
-                # If the scene is effectively empty of bounding objects, start from 0
-                if maxx_e == float('-inf') or maxy_e == float('-inf'):
-                    start_x = 0.0
-                    start_y = 0.0
-                else:
-                    # Start new grid after the existing scene content
-                    start_x = maxx_e + max_w + pad_x 
-                    start_y = maxy_e + max_d + pad_y # This pushes the entire grid up after existing content
-            else:
+            scene_bounds = _compute_xy_extents_bulk(context.scene.objects)
+            if scene_bounds:
+                _, maxx_e, _, maxy_e = scene_bounds
+                # Start new grid after the existing scene content
+                start_x = maxx_e + max_w + pad_x
+                start_y = maxy_e + max_d + pad_y # This pushes the entire grid up after existing content
+            else: # Empty scene, start from 0
                 start_x = start_y = 0.0
 
-        # phase 2: import and place in grid
-        for idx, (path, minx, miny, _, _) in enumerate(extents): # Use the calculated minx/miny, not the original extent width/depth
-            project_name = os.path.splitext(os.path.basename(path))[0]
-            existing_o = set(bpy.data.objects)
-            existing_c = set(bpy.data.collections)
+        # Calculate target X and Y for every project's origin point (its minX, minY) up front
+        if wm.batch_import_layout == 'SHELF':
+            # Shelf layout: each project gets its own packed offset from the start origin
+            offsets = np.asarray(_pack_shelf(extents, cols, pad_x, pad_y), dtype=np.float64)
+            xs = start_x + offsets[:, 0]
+            ys = start_y + offsets[:, 1]
+        else:
+            # grid position (positive Y direction); if columns is 0, place everything in one row (along X axis)
+            step_x = max_w + pad_x
+            step_y = max_d + pad_y
+            idxs = np.arange(len(extents))
+            cols_eff = cols if cols > 0 else len(extents)
+            xs = start_x + (idxs % cols_eff) * step_x
+            ys = start_y + (idxs // cols_eff) * step_y
 
+        # phase 2: import and place in grid
+        for idx, (path, project_name, minx, miny, _, _) in enumerate(extents): # Use the calculated minx/miny, not the original extent width/depth
             with bpy.data.libraries.load(path, link=False) as (df, dt):
                 dt.collections = df.collections
                 dt.objects = df.objects
-            new_objs = [o for o in bpy.data.objects if o not in existing_o]
-            new_colls = [c for c in bpy.data.collections if c not in existing_c]
+            # After the load dt holds the appended data-blocks themselves (None where loading failed)
+            new_objs = [o for o in dt.objects if o is not None]
+            new_colls = [c for c in dt.collections if c is not None]
 
             # create project collection
             pc = bpy.data.collections.new(project_name)
             context.scene.collection.children.link(pc)
 
             # top-level collections
-            roots = [c for c in new_colls if not any(c.name in p.children for p in new_colls)]
+            child_names = {ch.name for p in new_colls for ch in p.children}
+            roots = [c for c in new_colls if c.name not in child_names]
             for c in roots:
                 pc.children.link(c)
 
             # orphan collection
             orp = bpy.data.collections.new(f"{project_name}_orphans")
             pc.children.link(orp)
-            coll_objs = set(o for c in new_colls for o in c.objects)
-            for o in new_objs:
-                if o not in coll_objs:
-                    orp.objects.link(o)
-
-            # grid position (positive Y direction)
-            if cols > 0:
-                col = idx % cols
-                row = idx // cols
-            else: # If columns is 0, place everything in one row (along X axis)
-                col = idx
-                row = 0
-            
-            # Calculate target X and Y for this project's origin point (its minX, minY)
-            # The calculation shifts the project so its (minX, minY) aligns with the grid position
-            target_x = start_x + col * (max_w + pad_x)
-            target_y = start_y + row * (max_d + pad_y)
+            # Appended collections can also hold objects linked indirectly from other libraries,
+            # whose bare names may clash with local objects; name_full includes the library and
+            # is unique across both.
+            linked_names = set()
+            for c in new_colls:
+                linked_names.update(o.name_full for o in c.objects)
+            orphans = [o for o in new_objs if o.name_full not in linked_names]
+            link_orphan = orp.objects.link
+            for o in orphans:
+                link_orphan(o)
+
+            # The calculation shifts the project so its (minX, minY) aligns with its grid position
+            target_x = float(xs[idx])
+            target_y = float(ys[idx])
 
             # Calculate the translation needed for each object
             # The `minx` and `miny` here are from the loaded project's original bounds
             tx = target_x - minx
             ty = target_y - miny
             
-            for o in new_objs:
-                o.location.x += tx
-                o.location.y += ty
+            # Every imported object now lives somewhere under the project collection, so shift
+            # them all with one foreach_get/foreach_set round trip instead of per-object writes.
+            proj_objs = pc.all_objects
+            locs = np.empty(len(proj_objs) * 3, dtype=np.float32)
+            proj_objs.foreach_get('location', locs)
+            locs[0::3] += tx
+            locs[1::3] += ty
+            proj_objs.foreach_set('location', locs)
 
         return {'FINISHED'}
 
 # --- ExportPlugin.py content (modified for packing) ---
 
+# Items of the export collection enum. Blender keeps pointers to the returned strings, so the
+# list has to stay referenced from Python; it is only rebuilt after the data has changed.
+_collection_items = []
+_collection_items_dirty = True
+
 def get_collections(self, context):
-    return [(col.name, col.name, "") for col in bpy.data.collections]
+    global _collection_items_dirty
+    # The length check is an O(1) safety net for additions/removals that happen without a
+    # depsgraph update in between (e.g. scripts running in the same redraw cycle).
+    if _collection_items_dirty or len(_collection_items) != len(bpy.data.collections):
+        _collection_items[:] = [(col.name, col.name, "") for col in bpy.data.collections]
+        _collection_items_dirty = False
+    return _collection_items
+
+@persistent
+def _invalidate_collection_items(*args):
+    global _collection_items_dirty
+    _collection_items_dirty = True
+
+_collection_items_handlers = (
+    bpy.app.handlers.depsgraph_update_post,
+    bpy.app.handlers.load_post,
+    bpy.app.handlers.undo_post,
+    bpy.app.handlers.redo_post,
+)
 
 class ExportCollectionOperator(Operator, ExportHelper):
     """Export the selected collection to a new .blend with lowest-Y pivot at origin"""
@@ -236,19 +492,6 @@ class ExportCollectionOperator(Operator, ExportHelper):
 
         # Ensure the file has a .blend extension
         filepath = bpy.path.ensure_ext(self.filepath, ".blend")
-        original_fp = bpy.data.filepath
-        if not original_fp:
-            self.report({'ERROR'}, "Please save your blend file before exporting a collection.")
-            return {'CANCELLED'}
-
-        # --- FIX ATTEMPT: Pack all external data before export ---
-        if bpy.data.is_dirty or not bpy.data.is_saved:
-            self.report({'WARNING'}, "Saving the current blend file to pack external data. This might take a moment.")
-            # Use save_as to avoid overwriting if user doesn't want to save main file
-            # or ensure they save first. For simplicity, save_mainfile can be used.
-            bpy.ops.wm.save_mainfile() 
-        bpy.ops.file.pack_all() # Pack all external data into the .blend file
-        self.report({'INFO'}, "External data (including textures) packed into the current blend file.")
 
         # Gather objects in collection
         objs = list(collection.objects)
@@ -258,30 +501,63 @@ class ExportCollectionOperator(Operator, ExportHelper):
 
         # Gather related datablocks
         datas = [obj.data for obj in objs if getattr(obj, 'data', None)]
-        mats = []
-        for d in datas:
-            for m in getattr(d, 'materials', []):
-                if m and m not in mats:
-                    mats.append(m)
-        images = []
-        for m in mats:
-            if m.use_nodes and m.node_tree:
-                for node in m.node_tree.nodes:
-                    img = getattr(node, 'image', None)
-                    if img and img not in images:
-                        images.append(img)
-
-        # Determine pivot by lowest Y position (if objects exist)
-        pivot_loc = Vector((0.0, 0.0, 0.0))
-        if objs:
-            pivot_obj = min(objs, key=lambda o: o.matrix_world.translation.y) # Use world translation for better pivot
-            pivot_loc = pivot_obj.matrix_world.translation.copy()
-            
-        # Store original locations
-        orig_locs = {obj: obj.location.copy() for obj in objs}
+        try:
+            # Blender's C-level reverse-dependency walker maps every material to the data using
+            # it and every image to the materials (including their node trees) using it
+            data_set = set(datas)
+            mats = [m for m, users in bpy.data.user_map(subset=bpy.data.materials).items()
+                    if not users.isdisjoint(data_set)]
+            mat_set = set(mats)
+            images = [img for img, users in bpy.data.user_map(subset=bpy.data.images).items()
+                      if not users.isdisjoint(mat_set)]
+        except TypeError: # user_map signature not available, walk the node trees in Python
+            # dict.fromkeys de-duplicates in one pass while keeping first-seen order
+            mats = list(dict.fromkeys(m for d in datas for m in getattr(d, 'materials', []) if m))
+            images = list(dict.fromkeys(
+                img for m in mats if m.use_nodes and m.node_tree
+                for img in (getattr(node, 'image', None) for node in m.node_tree.nodes) if img))
+
+        # Pack only the images used by the exported materials so textures travel with the new
+        # file. They are unpacked again after writing, leaving the current file untouched.
+        # Already packed, generated and linked images need nothing (pack_all skipped linked ones
+        # too), so when every exported image is one of those the whole step is skipped. TILED
+        # (UDIM) images are file-backed as well and must travel with the file. Dirty images are
+        # left alone: pack() would store their unsaved pixels from memory, and the unpack that
+        # follows reloads them from disk, discarding the user's unsaved edits.
+        to_pack = []
+        for img in images:
+            if img.packed_file is not None or img.library is not None or img.source not in {'FILE', 'TILED'}:
+                continue
+            if img.is_dirty:
+                self.report({'WARNING'}, f"Image '{img.name}' has unsaved changes and was not packed; "
+                                         "save it to include it in the export.")
+                continue
+            to_pack.append(img)
+        if to_pack and not bpy.data.filepath:
+            # Relative image paths can only be resolved (and packed) from a saved file
+            self.report({'ERROR'}, "Please save your blend file before exporting a collection.")
+            return {'CANCELLED'}
+        packed_images = []
+        for img in to_pack:
+            try:
+                img.pack()
+            except RuntimeError as e:
+                self.report({'WARNING'}, f"Could not pack image '{img.name}': {e}")
+                continue
+            packed_images.append(img)
+
+        # Determine pivot by lowest Y world translation, read for all objects in one call
+        world_mats = np.empty(len(objs) * 16, dtype=np.float32)
+        collection.objects.foreach_get('matrix_world', world_mats)
+        translations = world_mats.reshape(-1, 4, 4)[:, 3, :3] # column-major: the last column is the translation
+        pivot_loc = translations[translations[:, 1].argmin()]
+
+        # Store original locations; objs mirrors collection.objects, so both can be moved in bulk
+        orig_locs = np.empty(len(objs) * 3, dtype=np.float32)
+        collection.objects.foreach_get('location', orig_locs)
         # Apply pivot transform by moving objects relative to the pivot
-        for obj in objs:
-            obj.location -= pivot_loc
+        shifted = orig_locs.reshape(-1, 3) - pivot_loc
+        collection.objects.foreach_set('location', shifted.ravel())
 
         # Create temporary scene for export
         export_scene = bpy.data.scenes.new(name="ExportScene")
@@ -302,9 +578,10 @@ class ExportCollectionOperator(Operator, ExportHelper):
             self.report({'INFO'}, f"Exported '{collection.name}' pivoted to '{filepath}'")
         except Exception as e:
             self.report({'ERROR'}, str(e))
-            # Restore original locations before exit
-            for obj, loc in orig_locs.items():
-                obj.location = loc
+            # Restore original locations and packing state before exit
+            collection.objects.foreach_set('location', orig_locs)
+            for img in packed_images:
+                img.unpack(method='REMOVE')
             # Clean up temporary collection and scene on failure
             if temp_collection.users == 1: # Only if temp_collection is not linked elsewhere
                 bpy.data.collections.remove(temp_collection)
@@ -319,8 +596,11 @@ class ExportCollectionOperator(Operator, ExportHelper):
             bpy.data.scenes.remove(export_scene)
         
         # Restore original locations
-        for obj, loc in orig_locs.items():
-            obj.location = loc
+        collection.objects.foreach_set('location', orig_locs)
+
+        # Unpack images that were only packed for the export
+        for img in packed_images:
+            img.unpack(method='REMOVE')
 
         return {'FINISHED'}
 
@@ -332,50 +612,64 @@ class COLLECTION_OT_delete_empty(Operator):
     bl_description = "Deletes all truly empty collections (no objects, no child collections) except the default 'Collection'."
 
     def execute(self, context):
-        deleted_count = 0
-        # Create a list of collections to iterate over as you might modify bpy.data.collections
-        collections_to_check = list(bpy.data.collections) 
-        self.report({'INFO'}, f"Starting empty collection cleanup. Total collections to check: {len(collections_to_check)}")
-
-        for collection in collections_to_check:
-            # Store the name BEFORE potential deletion to avoid ReferenceError
+        colls = bpy.data.collections
+        # Only tally here and report once at the end; a report per collection goes through the
+        # info log and UI redraw and dominates the runtime on large cleanups.
+        checked = skipped_default = has_objects = has_children = deleted_count = failed = 0
+
+        # Track how many children each collection still has and who its parents are, so that
+        # a collection that is going to be deleted can queue any parent it leaves empty. Chains
+        # of nested empty collections are reclaimed in a single run this way.
+        by_name = {}
+        child_count = {}
+        parents_of = {}
+        queue = deque()
+        for collection in colls:
+            checked += 1
             collection_name = collection.name
-
-            # Skip the default "Collection"
-            if collection_name == "Collection":
-                self.report({'INFO'}, f"  Skipping default 'Collection'.")
-                continue
-
-            self.report({'INFO'}, f"Checking collection: '{collection_name}'")
-            
-            # Check if the collection has any objects directly linked to it
-            if not collection.objects:
-                self.report({'INFO'}, f"  Collection '{collection_name}' has no objects. Checking for children...")
-                # Check if it has any child collections. A collection is not "empty" if it contains other collections.
-                if not collection.children:
-                    self.report({'INFO'}, f"  Collection '{collection_name}' has no children. Attempting to delete.")
-                    try:
-                        # Double-check no objects before removal, though 'if not collection.objects' already handles this
-                        if not collection.objects: 
-                            bpy.data.collections.remove(collection)
-                            deleted_count += 1
-                            # Use the stored name here
-                            self.report({'INFO'}, f"  Successfully deleted '{collection_name}'.")
-                        else:
-                            # Use the stored name here
-                            self.report({'WARNING'}, f"  Collection '{collection_name}' unexpectedly contained objects before deletion attempt; skipping.")
-                    except Exception as e:
-                        # Use the stored name here
-                        self.report({'ERROR'}, f"  Failed to delete '{collection_name}' due to an error: {e}")
-                else:
-                    self.report({'INFO'}, f"  Collection '{collection_name}' has children; skipping deletion as it's not truly empty.")
+            by_name[collection_name] = collection
+            child_count[collection_name] = len(collection.children)
+            for child in collection.children:
+                parents_of.setdefault(child.name, []).append(collection_name)
+
+            if collection_name == "Collection": # Skip the default "Collection"
+                skipped_default += 1
+            elif len(collection.objects) != 0:
+                has_objects += 1
+            elif child_count[collection_name]:
+                has_children += 1
             else:
-                self.report({'INFO'}, f"  Collection '{collection_name}' contains objects ({len(collection.objects)}); skipping deletion.")
-        
-        if deleted_count > 0:
-            self.report({'INFO'}, f"Finished. Deleted {deleted_count} empty collection(s).")
+                queue.append(collection_name)
+
+        # Resolve the whole cascade first, then remove everything at once so the dependency
+        # graph is rebuilt once instead of after every single removal
+        to_delete = []
+        while queue:
+            collection_name = queue.popleft()
+            to_delete.append(by_name[collection_name])
+            for parent_name in parents_of.get(collection_name, ()):
+                child_count[parent_name] -= 1
+                if (parent_name != "Collection" and not child_count[parent_name]
+                        and len(by_name[parent_name].objects) == 0):
+                    # Its last child is going away, so it is no longer kept for having children
+                    has_children -= 1
+                    queue.append(parent_name)
+
+        error = None
+        if to_delete:
+            try:
+                bpy.data.batch_remove(ids=to_delete)
+                deleted_count = len(to_delete)
+            except Exception as e:
+                failed = len(to_delete)
+                error = e
+
+        summary = (f"Checked {checked} collection(s): deleted {deleted_count}, kept {has_objects} with objects "
+                   f"and {has_children} with child collections, skipped {skipped_default} default 'Collection'.")
+        if failed:
+            self.report({'WARNING'}, f"{summary} {failed} collection(s) could not be deleted due to an error: {error}")
         else:
-            self.report({'INFO'}, "Finished. No truly empty collections found to delete (or they contain other collections).")
+            self.report({'INFO'}, summary)
         return {'FINISHED'}
 
 # --- Combined UI Panel (unchanged) ---
@@ -399,6 +693,8 @@ class COLLECTION_PT_main_panel(Panel):
         box_import.prop(wm, 'batch_import_spacing_x', text='Spacing X')
         box_import.prop(wm, 'batch_import_spacing_y', text='Spacing Y')
         box_import.prop(wm, 'batch_import_columns', text='Projects per Row')
+        box_import.prop(wm, 'batch_import_layout', text='Layout')
+        box_import.prop(wm, 'batch_import_parallel_scan', text='Parallel Scan')
         box_import.operator('batch_import.execute', text='Import Projects')
 
         # Export Collection Subsection
@@ -429,21 +725,45 @@ def register():
     bpy.types.WindowManager.batch_import_spacing_x = FloatProperty(name='Additional Spacing X', default=0.0)
     bpy.types.WindowManager.batch_import_spacing_y = FloatProperty(name='Additional Spacing Y', default=0.0)
     bpy.types.WindowManager.batch_import_columns = IntProperty(name='Projects per Row', default=0, min=0)
+    bpy.types.WindowManager.batch_import_layout = EnumProperty(
+        name='Layout',
+        description='How imported projects are arranged',
+        items=[
+            ('GRID', 'Grid', 'Place every project in a uniform cell sized to the largest project'),
+            ('SHELF', 'Shelf', 'Pack projects row by row in order of decreasing depth'),
+        ],
+        default='GRID',
+    )
+    bpy.types.WindowManager.batch_import_parallel_scan = BoolProperty(
+        name='Parallel Scan',
+        description=f'Measure projects in background Blender processes (used for {PARALLEL_SCAN_MIN_FILES} or more files)',
+        default=False,
+    )
     bpy.types.Scene.export_collection_list = EnumProperty(
         name="Collection",
         description="Choose the collection to export",
         items=get_collections
     )
+    for handlers in _collection_items_handlers:
+        handlers.append(_invalidate_collection_items)
 
 def unregister():
+    for handlers in _collection_items_handlers:
+        if _invalidate_collection_items in handlers:
+            handlers.remove(_invalidate_collection_items)
     del bpy.types.WindowManager.batch_import_folder
     del bpy.types.WindowManager.batch_import_ref_obj
     del bpy.types.WindowManager.batch_import_spacing_x
     del bpy.types.WindowManager.batch_import_spacing_y
     del bpy.types.WindowManager.batch_import_columns
+    del bpy.types.WindowManager.batch_import_layout
+    del bpy.types.WindowManager.batch_import_parallel_scan
     del bpy.types.Scene.export_collection_list
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
 if __name__ == '__main__':
-    register()
\ No newline at end of file
+    if SCAN_WORKER_ARG in sys.argv:
+        _scan_worker_main()
+    else:
+        register()
\ No newline at end of file